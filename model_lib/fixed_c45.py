@@ -1,39 +1,48 @@
-import math
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 import pandas as pd
 import numpy as np
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
 
 class _DecisionNode:
-    def __init__(self, attribute):
+    def __init__(self, attribute, attribute_index, cardinality, threshold=None, fallback_label=None):
         self.attribute = attribute
-        self.children = {}
+        self.attribute_index = attribute_index
+        self.threshold = threshold
+        self.fallback_label = fallback_label
+        self.children = [None] * cardinality
 
     def depth(self):
-        if len(self.children) == 0:
-            return 1
-        else:
-            max_depth = 0
-            for child in self.children.values():
-                if isinstance(child, _DecisionNode):
-                    child_depth = child.depth()
-                    if child_depth > max_depth:
-                        max_depth = child_depth
-            return max_depth + 1
+        max_depth = 0
+        for _, child in self.child_items():
+            if isinstance(child, _DecisionNode):
+                child_depth = child.depth()
+                if child_depth > max_depth:
+                    max_depth = child_depth
+        return max_depth + 1
 
     def add_child(self, value, node):
         self.children[value] = node
 
+    def child_items(self):
+        return ((value, child) for value, child in enumerate(self.children) if child is not None)
+
     def count_leaves(self):
-        if len(self.children) == 0:
-            return 1
-        else:
-            count = 0
-            for child in self.children.values():
-                if isinstance(child, _DecisionNode):
-                    count += child.count_leaves()
-                else:
-                    count += 1
-            return count
+        count = 0
+        for _, child in self.child_items():
+            if isinstance(child, _DecisionNode):
+                count += child.count_leaves()
+            else:
+                count += 1
+        return count
 
 
 class _LeafNode:
@@ -42,8 +51,154 @@ class _LeafNode:
         self.weight = weight
 
 
+_EPSILON = 1e-12
+_MAX_COMPILED_NODES = 1000
+
+
+def _code_dtype(cardinality):
+    if cardinality < 128:
+        return np.int8
+    if cardinality < 32768:
+        return np.int16
+    return np.int32
+
+
+def _xlog2x(counts, log2):
+    return counts * log2[counts]
+
+
+def _entropy_from_counts(counts, log2):
+    total = counts.sum()
+    return log2[total] - _xlog2x(counts, log2).sum() / total
+
+
+@contextmanager
+def _numba_threads(n_jobs):
+    if numba is None:
+        yield
+        return
+    previous = numba.get_num_threads()
+    numba.set_num_threads(max(1, min(n_jobs, numba.config.NUMBA_NUM_THREADS)))
+    try:
+        yield
+    finally:
+        numba.set_num_threads(previous)
+
+
+if numba is not None:
+    @numba.njit(cache=True, parallel=True, nogil=True)
+    def _best_attribute(X, y, rows, class_counts, attributes, cardinality, is_numeric, log2):
+        n_classes = len(class_counts)
+        total_count = len(rows)
+        total_entropy = log2[total_count]
+        for c in range(n_classes):
+            total_entropy -= class_counts[c] * log2[class_counts[c]] / total_count
+
+        gains = np.zeros(len(attributes))
+        split_infos = np.zeros(len(attributes))
+        thresholds = np.full(len(attributes), -1)
+        for k in numba.prange(len(attributes)):
+            attribute_index = attributes[k]
+            histogram = np.zeros((cardinality[attribute_index], n_classes), dtype=np.int64)
+            for i in range(len(rows)):
+                histogram[X[rows[i], attribute_index], y[rows[i]]] += 1
+
+            if is_numeric[attribute_index]:
+                left = np.zeros(n_classes, dtype=np.int64)
+                left_count = 0
+                threshold_gains = np.full(histogram.shape[0], -np.inf)
+                threshold_split_infos = np.zeros(histogram.shape[0])
+                for v in range(histogram.shape[0] - 1):
+                    value_count = 0
+                    for c in range(n_classes):
+                        value_count += histogram[v, c]
+                        left[c] += histogram[v, c]
+                    left_count += value_count
+                    if value_count == 0:
+                        continue
+                    right_count = total_count - left_count
+                    if right_count == 0:
+                        break
+
+                    value_terms = left_count * log2[left_count] + right_count * log2[right_count]
+                    cell_terms = 0.0
+                    for c in range(n_classes):
+                        cell_terms += left[c] * log2[left[c]]
+                        cell_terms += (class_counts[c] - left[c]) * log2[class_counts[c] - left[c]]
+                    threshold_gains[v] = total_entropy - (value_terms - cell_terms) / total_count
+                    threshold_split_infos[v] = log2[total_count] - value_terms / total_count
+
+                best_gain = threshold_gains.max()
+                if best_gain > -np.inf:
+                    for v in range(histogram.shape[0]):
+                        if threshold_gains[v] >= best_gain - _EPSILON:
+                            gains[k] = threshold_gains[v]
+                            split_infos[k] = threshold_split_infos[v]
+                            thresholds[k] = v
+                            break
+                continue
+
+            value_terms = 0.0
+            cell_terms = 0.0
+            present_values = 0
+            for v in range(histogram.shape[0]):
+                value_count = 0
+                for c in range(n_classes):
+                    value_count += histogram[v, c]
+                    cell_terms += histogram[v, c] * log2[histogram[v, c]]
+                value_terms += value_count * log2[value_count]
+                if value_count > 0:
+                    present_values += 1
+            if present_values < 2:
+                continue
+            gains[k] = total_entropy - (value_terms - cell_terms) / total_count
+            split_infos[k] = log2[total_count] - value_terms / total_count
+
+        best_attribute = -1
+        best_gain_ratio = 0.0
+        for k in range(len(attributes)):
+            if split_infos[k] > _EPSILON and gains[k] / split_infos[k] > best_gain_ratio + _EPSILON:
+                best_gain_ratio = gains[k] / split_infos[k]
+                best_attribute = k
+        if best_attribute < 0:
+            return best_attribute, -1
+        return best_attribute, thresholds[best_attribute]
+
+    @numba.njit(cache=True, parallel=True)
+    def _predict_rows(X, node_attribute, node_threshold, node_offset, node_children, node_label):
+        predictions = np.empty(len(X), dtype=np.int32)
+        for i in numba.prange(len(X)):
+            node = 0
+            while node_attribute[node] >= 0:
+                value = X[i, node_attribute[node]]
+                if node_threshold[node] >= 0:
+                    value = 0 if value <= node_threshold[node] else 1
+                elif value < 0 or node_children[node_offset[node] + value] < 0:
+                    break
+                node = node_children[node_offset[node] + value]
+            predictions[i] = node_label[node]
+        return predictions
+else:
+    _best_attribute = None
+
+    def _predict_rows(X, node_attribute, node_threshold, node_offset, node_children, node_label):
+        nodes = np.zeros(len(X), dtype=np.int32)
+        active = np.flatnonzero(node_attribute[nodes] >= 0)
+        while len(active) > 0:
+            current = nodes[active]
+            values = X[active, node_attribute[current]]
+            thresholds = node_threshold[current]
+            values = np.where(thresholds >= 0, values > thresholds, values)
+            children = np.where(values >= 0, node_children[node_offset[current] + np.maximum(values, 0)], -1)
+            active = active[children >= 0]
+            nodes[active] = children[children >= 0]
+            active = active[node_attribute[nodes[active]] >= 0]
+        return node_label[nodes]
+
+
 class C45Classifier:
-    def __init__(self, max_depth=None, min_samples_split=2, min_samples_leaf=1):
+    def __init__(self, max_depth=None, min_samples_split=2, min_samples_leaf=1, n_jobs=1,
+                 numeric_attributes=None):
         self.tree = None
         self.attributes = None
         self.data = None
@@ -52,165 +207,248 @@ class C45Classifier:
         self.deep = 0
         self.min_samples_split = min_samples_split
         self.min_samples_leaf = min_samples_leaf
-
-    def __calculate_entropy(self, data, weights):
-        class_counts = {}
-        total_weight = 0.0
-
-        for i, record in enumerate(data):
-            label = record[-1]
-            weight = weights[i]
-
-            if label not in class_counts:
-                class_counts[label] = 0.0
-            class_counts[label] += weight
-            total_weight += weight
-
-        entropy = 0.0
-
-        for count in class_counts.values():
-            probability = count / total_weight
-            entropy -= probability * math.log2(probability)
-
-        return entropy
-
-    def __split_data(self, data, attribute_index, attribute_value, weights):
-        split_data = []
-        split_weights = []
-
-        for i, record in enumerate(data):
-            if record[attribute_index] == attribute_value:
-                split_data.append(record[:attribute_index] + record[attribute_index + 1:])
-                split_weights.append(weights[i])
-
-        return split_data, split_weights
-
-    def __select_best_attribute_c50(self, data, attributes, weights):
-        total_entropy = self.__calculate_entropy(data, weights)
+        self.n_jobs = n_jobs
+        self.numeric_attributes = numeric_attributes
+        self._compiled_predictor = None
+
+    def __value_class_counts(self, rows, codes, cardinality):
+        cells = codes.astype(np.intp) * self._n_classes + self._y[rows]
+        histogram = np.bincount(cells, minlength=cardinality * self._n_classes)
+        return histogram.reshape(cardinality, self._n_classes)
+
+    def __split_data(self, rows, codes, value_counts):
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(value_counts)[:-1]
+        return np.split(rows[order], bounds)
+
+    def __best_threshold(self, histogram, class_counts, total_entropy):
+        candidates = np.flatnonzero(histogram.sum(axis=1))[:-1]
+        if len(candidates) == 0:
+            return 0.0, 0.0, -1
+
+        left = histogram.cumsum(axis=0)[candidates]
+        right = class_counts - left
+        left_counts, right_counts = left.sum(axis=1), right.sum(axis=1)
+        total = class_counts.sum()
+        value_terms = _xlog2x(left_counts, self._log2) + _xlog2x(right_counts, self._log2)
+        cell_terms = _xlog2x(left, self._log2).sum(axis=1) + _xlog2x(right, self._log2).sum(axis=1)
+        gains = total_entropy - (value_terms - cell_terms) / total
+        best = np.flatnonzero(gains >= gains.max() - _EPSILON)[0]
+        return gains[best], self._log2[total] - value_terms[best] / total, candidates[best]
+
+    def __select_best_attribute_c50(self, rows, attributes, class_counts):
+        if _best_attribute is not None:
+            best_attribute, threshold = _best_attribute(self._X, self._y, rows, class_counts, attributes,
+                                                        self._cardinality, self._is_numeric, self._log2)
+            return (best_attribute, threshold) if best_attribute >= 0 else (None, -1)
+
+        total_entropy = _entropy_from_counts(class_counts, self._log2)
         best_attribute = None
+        best_threshold = -1
         best_gain_ratio = 0.0
-        split_info = 0.0
-        for attribute_index in range(len(attributes)):
-            attribute_values = set([record[attribute_index] for record in data])
-            attribute_entropy = 0.0
-
-            for value in attribute_values:
-                subset, subset_weights = self.__split_data(data, attribute_index, value, weights)
-                subset_entropy = self.__calculate_entropy(subset, subset_weights)
-                subset_probability = sum(subset_weights) / sum(weights)
-                attribute_entropy += subset_probability * subset_entropy
-                split_info -= subset_probability * math.log2(subset_probability)
-
-            gain = total_entropy - attribute_entropy
+        for position, attribute_index in enumerate(attributes):
+            histogram = self.__value_class_counts(rows, self._X[rows, attribute_index],
+                                                  self._cardinality[attribute_index])
+            if self._is_numeric[attribute_index]:
+                gain, split_info, threshold = self.__best_threshold(histogram, class_counts, total_entropy)
+            else:
+                value_counts = histogram.sum(axis=1)
+                threshold = -1
+                if np.count_nonzero(value_counts) < 2:
+                    gain, split_info = 0.0, 0.0
+                else:
+                    value_terms = _xlog2x(value_counts, self._log2).sum()
+                    attribute_entropy = (value_terms - _xlog2x(histogram, self._log2).sum()) / len(rows)
+                    split_info = self._log2[len(rows)] - value_terms / len(rows)
+                    gain = total_entropy - attribute_entropy
 
-            if split_info != 0.0:
+            if split_info > _EPSILON:
                 gain_ratio = gain / split_info
             else:
                 gain_ratio = 0.0
 
-            if gain_ratio > best_gain_ratio:
+            if gain_ratio > best_gain_ratio + _EPSILON:
                 best_gain_ratio = gain_ratio
-                best_attribute = attribute_index
-
-        return best_attribute
-
-    def __majority_class(self, data, weights):
-        class_counts = {}
-
-        for i, record in enumerate(data):
-            label = record[-1]
-            weight = weights[i]
-
-            if label not in class_counts:
-                class_counts[label] = 0.0
-            class_counts[label] += weight
-
-        majority_class = None
-        max_count = 0.0
+                best_attribute = position
+                best_threshold = threshold
 
-        for label, count in class_counts.items():
-            if count > max_count:
-                max_count = count
-                majority_class = label
+        return best_attribute, best_threshold
 
-        return majority_class
+    def __node_majority(self, rows, class_counts):
+        majority_class = class_counts.argmax()
+        tied = class_counts == class_counts[majority_class]
+        if np.count_nonzero(tied) > 1:
+            labels = self._y[rows]
+            majority_class = labels[tied[labels]][0]
+        return self._classes[majority_class]
 
-    def __build_decision_tree(self, data, attributes, weights, depth=0):
-        class_labels = set([record[-1] for record in data])
+    def __expand_node(self, rows, attributes, depth, class_counts=None):
+        if class_counts is None:
+            class_counts = np.bincount(self._y[rows], minlength=self._n_classes)
+        leaf = _LeafNode(self.__node_majority(rows, class_counts), class_counts.sum() * self.weight)
 
-        if len(class_labels) == 1:
-            return _LeafNode(class_labels.pop(), sum(weights))
+        if np.count_nonzero(class_counts) == 1:
+            return leaf, []
 
         if len(attributes) == 1:
-            return _LeafNode(self.__majority_class(data, weights), sum(weights))
+            return leaf, []
 
         if depth == self.max_depth:
-            return _LeafNode(self.__majority_class(data, weights), sum(weights))
+            return leaf, []
 
-        sample = len(data)
+        sample = len(rows)
 
         if sample < self.min_samples_leaf:
-            return _LeafNode(self.__majority_class(data, weights), sum(weights))
+            return leaf, []
 
         if sample < self.min_samples_split:
-            return _LeafNode(self.__majority_class(data, weights), sum(weights))
+            return leaf, []
 
-        best_attribute = self.__select_best_attribute_c50(data, attributes, weights)
+        best_attribute, threshold = self.__select_best_attribute_c50(rows, attributes, class_counts)
 
         if best_attribute is None:
-            return _LeafNode(self.__majority_class(data, weights), sum(weights))
-
-        best_attribute_name = attributes[best_attribute]
-        tree = _DecisionNode(best_attribute_name)
-        attributes = attributes[:best_attribute] + attributes[best_attribute + 1:]
-        attribute_values = set([record[best_attribute] for record in data])
-        new_depth = depth + 1
-        self.deep = max(self.deep, new_depth)
-        for value in attribute_values:
-            subset, subset_weights = self.__split_data(data, best_attribute, value, weights)
-
-            if len(subset) == 0:
-                tree.add_child(value, _LeafNode(self.__majority_class(data, weights), sum(subset_weights)))
-            else:
-                tree.add_child(value, self.__build_decision_tree(subset, attributes, subset_weights, new_depth))
+            return leaf, []
+
+        attribute_index = attributes[best_attribute]
+        codes = self._X[rows, attribute_index]
+        if self._is_numeric[attribute_index]:
+            tree = _DecisionNode(self.attributes[attribute_index], attribute_index, 2, threshold, leaf.label)
+            codes = (codes > threshold).astype(np.int32)
+        else:
+            tree = _DecisionNode(self.attributes[attribute_index], attribute_index, self._cardinality[attribute_index],
+                                 fallback_label=leaf.label)
+            attributes = np.delete(attributes, best_attribute)
+        histogram = self.__value_class_counts(rows, codes, len(tree.children))
+        value_counts = histogram.sum(axis=1)
+        subsets = self.__split_data(rows, codes, value_counts)
+        children = []
+        for value in np.flatnonzero(value_counts):
+            children.append((value, subsets[value], attributes, depth + 1, histogram[value]))
+
+        return tree, children
+
+    def __effective_n_jobs(self):
+        if self.n_jobs is None:
+            return 1
+        if self.n_jobs == 0:
+            raise Exception('n_jobs must not be 0!')
+        if self.n_jobs < 0:
+            return max(1, os.cpu_count() + 1 + self.n_jobs)
+        return self.n_jobs
+
+    def __build_decision_tree(self, rows, attributes):
+        # the numba kernel already spreads each node over prange threads, and calling
+        # it from several node threads at once is unsafe under some threading layers
+        n_jobs = self.__effective_n_jobs() if numba is None else 1
+        root = None
+        work = deque([(None, None, rows, attributes, 0, None)])
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            while work:
+                if n_jobs > 1 and len(work) >= n_jobs:
+                    batch = list(work)
+                    work.clear()
+                    expanded = executor.map(lambda item: self.__expand_node(*item[2:]), batch)
+                else:
+                    batch = [work.popleft()]
+                    expanded = [self.__expand_node(*batch[0][2:])]
+
+                for (parent, value, _, _, depth, _), (node, children) in zip(batch, expanded):
+                    if parent is None:
+                        root = node
+                    else:
+                        parent.add_child(value, node)
+                    if isinstance(node, _DecisionNode):
+                        self.deep = max(self.deep, depth + 1)
+                    work.extend((node,) + child for child in children)
 
-        return tree
+        return root
 
-    def __make_tree(self, data, attributes, weights):
-        return self.__build_decision_tree(data, attributes, weights)
+    def __make_tree(self, rows, attributes):
+        return self.__build_decision_tree(rows, attributes)
 
     def __train(self, data, weight=1):
         self.weight = weight
         self.attributes = data.columns.tolist()[:-1]
-        weights = [self.weight] * len(data)
-        self.tree = self.__make_tree(data.values.tolist(), self.attributes, weights)
-        self.data = data
-
-    def __classify(self, tree=None, instance=[]):
-        if self.tree is None:
-            raise Exception('Decision tree has not been trained yet!')
-        if tree is None:
-            tree = self.tree
-
-        if isinstance(tree, _LeafNode):
-            return tree.label
-
-        attribute = tree.attribute
-        attribute_index = self.attributes.index(attribute)
-        attribute_values = instance[attribute_index]
-
-        if attribute_values in tree.children:
-            child_node = tree.children[attribute_values]
-            return self.__classify(child_node, instance)
+        if self.numeric_attributes == 'auto':
+            self._is_numeric = np.array([pd.api.types.is_numeric_dtype(data.iloc[:, i])
+                                         and not pd.api.types.is_bool_dtype(data.iloc[:, i])
+                                         for i in range(len(self.attributes))])
         else:
-            class_labels = []
-            for child_node in tree.children.values():
-                if isinstance(child_node, _LeafNode):
-                    class_labels.append(child_node.label)
-            if len(class_labels) == 0:
-                return self.__majority_class(self.data.values.tolist(), [1.0] * len(self.data))
-            majority_class = max(set(class_labels))
-            return majority_class
+            self._is_numeric = np.isin(self.attributes, self.numeric_attributes or [])
+        codes, uniques = [], []
+        for i in range(data.shape[1]):
+            is_numeric = i < len(self.attributes) and self._is_numeric[i]
+            column_codes, column_uniques = pd.factorize(data.iloc[:, i], sort=is_numeric, use_na_sentinel=False)
+            codes.append(column_codes)
+            uniques.append(column_uniques)
+        self._uniques, self._classes = uniques[:-1], uniques[-1]
+        self._n_classes = len(self._classes)
+        self._cardinality = np.array([len(u) for u in self._uniques], dtype=np.int32)
+        x_dtype = _code_dtype(self._cardinality.max(initial=1))
+        self._X = np.asfortranarray(np.stack(codes[:-1], axis=1).astype(x_dtype))
+        self._y = codes[-1].astype(_code_dtype(self._n_classes))
+        self._value_index = [pd.Index(u) for u in self._uniques]
+        self._log2 = np.log2(np.maximum(np.arange(len(data) + 1), 1))
+        rows = np.arange(len(data))
+        with _numba_threads(self.__effective_n_jobs()):
+            self.tree = self.__make_tree(rows, np.arange(len(self.attributes)))
+        self.data = data
+        self.__compile_tree()
+        self._compiled_predictor = None
+
+    def __compile_tree(self):
+        class_codes = {label: code for code, label in enumerate(self._classes)}
+        nodes = [self.tree]
+        node_ids = {id(self.tree): 0}
+        for node in nodes:
+            if isinstance(node, _DecisionNode):
+                for _, child_node in node.child_items():
+                    node_ids[id(child_node)] = len(nodes)
+                    nodes.append(child_node)
+
+        node_offset = np.zeros(len(nodes) + 1, dtype=np.int64)
+        node_offset[1:] = np.cumsum([len(node.children) if isinstance(node, _DecisionNode) else 0 for node in nodes])
+        node_attribute = np.full(len(nodes), -1, dtype=np.int32)
+        node_threshold = np.full(len(nodes), -1, dtype=np.int32)
+        node_children = np.full(node_offset[-1], -1, dtype=np.int32)
+        node_label = np.empty(len(nodes), dtype=np.int32)
+        node_weight = np.zeros(len(nodes))
+        for node_id, node in enumerate(nodes):
+            if isinstance(node, _LeafNode):
+                node_label[node_id] = class_codes[node.label]
+                node_weight[node_id] = node.weight
+                continue
+
+            node_attribute[node_id] = node.attribute_index
+            node_label[node_id] = class_codes[node.fallback_label]
+            if node.threshold is not None:
+                node_threshold[node_id] = node.threshold
+            for value, child_node in node.child_items():
+                node_children[node_offset[node_id] + value] = node_ids[id(child_node)]
+
+        for node_id in range(len(nodes) - 1, -1, -1):
+            if node_attribute[node_id] >= 0:
+                child_ids = node_children[node_offset[node_id]:node_offset[node_id + 1]]
+                node_weight[node_id] = node_weight[child_ids[child_ids >= 0]].sum()
+
+        self._node_attribute = node_attribute
+        self._node_threshold = node_threshold
+        self._node_offset = node_offset
+        self._node_children = node_children
+        self._node_label = node_label
+        self._node_weight = node_weight
+
+    def __node_children(self, node_id):
+        return self._node_children[self._node_offset[node_id]:self._node_offset[node_id + 1]]
+
+    def __encode(self, data):
+        X = np.empty(data.shape, dtype=np.int32)
+        for i in range(data.shape[1]):
+            if self._is_numeric[i]:
+                X[:, i] = self._uniques[i].searchsorted(data.iloc[:, i], side='left')
+            else:
+                X[:, i] = self._value_index[i].get_indexer(data.iloc[:, i])
+        return X
 
     def fit(self, data, label, weight=1):
         if isinstance(data, pd.DataFrame):
@@ -221,19 +459,98 @@ class C45Classifier:
         res = {
             'max_depth': self.max_depth,
             'min_samples_split': self.min_samples_split,
-            'min_samples_leaf': self.min_samples_leaf
+            'min_samples_leaf': self.min_samples_leaf,
+            'n_jobs': self.n_jobs,
+            'numeric_attributes': self.numeric_attributes
         }
         return res
 
+    def compile_predictor(self):
+        if self.tree is None:
+            raise Exception('Decision tree has not been trained yet!')
+        if len(self._node_attribute) > _MAX_COMPILED_NODES:
+            raise Exception('Decision tree is too large to compile into a predictor!')
+        node_depth = np.zeros(len(self._node_attribute), dtype=np.int32)
+        for node_id in np.flatnonzero(self._node_attribute >= 0):
+            children = self.__node_children(node_id)
+            node_depth[children[children >= 0]] = node_depth[node_id] + 1
+        if node_depth.max() >= 90:
+            raise Exception('Decision tree is too deep to compile into a predictor!')
+        # without numba the generated code is a plain Python loop, slower than the vectorised table walk
+        if numba is None:
+            self._compiled_predictor = None
+            return self
+
+        lines = ['def _predict_one(x):']
+
+        def emit(node_id, indent):
+            pad = '    ' * indent
+            attribute = self._node_attribute[node_id]
+            if attribute < 0:
+                lines.append(f'{pad}return {self._node_label[node_id]}')
+                return
+
+            children = self.__node_children(node_id)
+            threshold = self._node_threshold[node_id]
+            if threshold >= 0:
+                if self._node_weight[children[0]] >= self._node_weight[children[1]]:
+                    lines.append(f'{pad}if x[{attribute}] <= {threshold}:')
+                    emit(children[0], indent + 1)
+                    lines.append(f'{pad}else:')
+                    emit(children[1], indent + 1)
+                else:
+                    lines.append(f'{pad}if x[{attribute}] > {threshold}:')
+                    emit(children[1], indent + 1)
+                    lines.append(f'{pad}else:')
+                    emit(children[0], indent + 1)
+                return
+
+            values = sorted(np.flatnonzero(children >= 0), key=lambda v: -self._node_weight[children[v]])
+            for i, value in enumerate(values):
+                lines.append(f"{pad}{'if' if i == 0 else 'elif'} x[{attribute}] == {value}:")
+                emit(children[value], indent + 1)
+            lines.append(f'{pad}return {self._node_label[node_id]}')
+
+        emit(0, 1)
+        lines += [
+            '',
+            'def _predict_all(X):',
+            '    predictions = np.empty(len(X), dtype=np.int32)',
+            '    for i in prange(len(X)):',
+            '        predictions[i] = _predict_one(X[i])',
+            '    return predictions',
+        ]
+        namespace = {'np': np, 'prange': numba.prange}
+        exec('\n'.join(lines), namespace)
+        namespace['_predict_one'] = numba.njit(namespace['_predict_one'])
+        namespace['_predict_all'] = numba.njit(parallel=True)(namespace['_predict_all'])
+        self._compiled_predictor = namespace['_predict_all']
+        return self
+
     def predict(self, data):
-        if isinstance(data, pd.DataFrame):
-            data = data.values.tolist()
-        elif isinstance(data, list) and isinstance(data[0], dict):
+        if self.tree is None:
+            raise Exception('Decision tree has not been trained yet!')
+        if isinstance(data, list) and isinstance(data[0], dict):
             data = [list(d.values()) for d in data]
+        data = pd.DataFrame(data)
 
-        if len(data[0]) != len(self.attributes):
+        if data.shape[1] != len(self.attributes):
             raise Exception('Number of variables in data and attributes do not match!')
-        return [self.__classify(None, record) for record in data]
+        X = self.__encode(data)
+        n_jobs = self.__effective_n_jobs()
+        if numba is None and n_jobs > 1 and len(X) >= n_jobs:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                predictions = np.concatenate(list(executor.map(self.__predict_codes, np.array_split(X, n_jobs))))
+        else:
+            with _numba_threads(n_jobs):
+                predictions = self.__predict_codes(X)
+        return self._classes[predictions].tolist()
+
+    def __predict_codes(self, X):
+        if self._compiled_predictor is not None:
+            return self._compiled_predictor(X)
+        return _predict_rows(X, self._node_attribute, self._node_threshold, self._node_offset, self._node_children,
+                             self._node_label)
 
     def evaluate(self, x_test, y_test):
         y_pred = self.predict(x_test)
@@ -261,6 +578,11 @@ class C45Classifier:
         for key in acc:
             print("Accuracy ", key, ": ", acc[key])
 
+    def __condition(self, node, value):
+        if node.threshold is None:
+            return '=', self._uniques[node.attribute_index][value]
+        return '<=' if value == 0 else '>', self._uniques[node.attribute_index][node.threshold]
+
     def generate_tree_diagram(self, graphviz, filename):
         dot = graphviz.Digraph()
 
@@ -272,8 +594,9 @@ class C45Classifier:
                 if parent_node:
                     dot.edge(str(id(parent_node)), str(id(node)), label=edge_label)
 
-                for value, child_node in node.children.items():
-                    build_tree(child_node, node, value)
+                for value, child_node in node.child_items():
+                    operator, value_label = self.__condition(node, value)
+                    build_tree(child_node, node, value_label if operator == '=' else f"{operator} {value_label}")
             elif isinstance(node, _LeafNode):
                 current_node_label = f"Class: {node.label}, Weight: {node.weight}"
                 dot.node(str(id(node)), label=current_node_label, shape="box")
@@ -297,8 +620,9 @@ class C45Classifier:
             return
 
         attribute = tree.attribute
-        for value, child_node in tree.children.items():
-            self.print_rules(child_node, rule + attribute + ' = ' + str(value))
+        for value, child_node in tree.child_items():
+            operator, value_label = self.__condition(tree, value)
+            self.print_rules(child_node, rule + attribute + ' ' + operator + ' ' + str(value_label))
 
     def rules(self):
         rules = []
@@ -307,9 +631,10 @@ class C45Classifier:
             if isinstance(node, _DecisionNode):
                 current_node_label = node.attribute
                 if parent_node:
-                    rule += f" AND {current_node_label} = {edge_label}"
-                for value, child_node in node.children.items():
-                    build_rules(child_node, node, value, rule)
+                    rule += f" AND {current_node_label} {edge_label}"
+                for value, child_node in node.child_items():
+                    operator, value_label = self.__condition(node, value)
+                    build_rules(child_node, node, f"{operator} {value_label}", rule)
             elif isinstance(node, _LeafNode):
                 current_node_label = f"Class: {node.label}, Weight: {node.weight}"
                 if parent_node:
@@ -0,0 +1,24 @@
+import unittest
+
+import pandas as pd
+
+from model_lib.fixed_c45 import C45Classifier
+
+
+class NumericAttributeTest(unittest.TestCase):
+    def setUp(self):
+        self.X = pd.DataFrame({'Age': [20, 20, 20, 30, 30, 30], 'Class': ['Eco'] * 6})
+        self.y = pd.Series(['young'] * 3 + ['old'] * 3, name='label')
+
+    def test_values_between_training_values(self):
+        model = C45Classifier(numeric_attributes='auto')
+        model.fit(self.X, self.y)
+        test = pd.DataFrame({'Age': [15, 20, 21, 25, 29, 30, 45], 'Class': ['Eco'] * 7})
+        expected = ['young', 'young', 'old', 'old', 'old', 'old', 'old']
+        self.assertEqual(model.predict(test), expected)
+        model.compile_predictor()
+        self.assertEqual(model.predict(test), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()